@@ -1,9 +1,10 @@
 import os
 import sys
 import time
+import threading
 from fastapi import FastAPI, HTTPException, Response
 from pydantic import BaseModel, Field, ValidationError, model_validator
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 import pandas as pd
 import mlflow.pyfunc
 from sklearn.model_selection import train_test_split
@@ -91,8 +92,9 @@ def _update_gauges():
     except Exception:
         pass
     try:
-        cursor.execute("SELECT COUNT(*) FROM housinglogs")
-        total = cursor.fetchone()[0]
+        with db_lock:
+            cursor.execute("SELECT COUNT(*) FROM housinglogs")
+            total = cursor.fetchone()[0]
         MLOPS_DAILY_PREDICTIONS.labels(service=SERVICE).set(total)
     except Exception:
         pass
@@ -104,7 +106,7 @@ def _update_gauges():
 model = joblib.load("models/DecisionTree.pkl")
 
 # Calculate and update model metrics
-df = pd.read_csv("data/housing.csv")
+df = pd.read_parquet("data/housing.parquet")
 X = df.drop("MedHouseVal", axis=1)
 y = df["MedHouseVal"]
 X_train, X_test, y_train, y_test = train_test_split(
@@ -130,6 +132,8 @@ logging.basicConfig(
 
 conn = sqlite3.connect("housinglogs/predictions.db", check_same_thread=False)
 cursor = conn.cursor()
+# Sync endpoints run in a threadpool; serialize access to the shared cursor
+db_lock = threading.Lock()
 cursor.execute(
     """
 CREATE TABLE IF NOT EXISTS housinglogs (
@@ -280,6 +284,26 @@ class HousingResponse(BaseModel):
         }
 
 
+class HousingBatchRequest(BaseModel):
+    """Request model for predicting several block groups in one call."""
+
+    samples: List[HousingRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=1000,
+        description="Housing records to predict, validated individually.",
+    )
+
+
+class HousingBatchResponse(BaseModel):
+    """Response model for batch housing price predictions."""
+
+    predictions: List[float] = Field(
+        ...,
+        description="Predicted median house values, in the same order as the request samples",
+    )
+
+
 class ValidationErrorResponse(BaseModel):
     """Response model for validation errors."""
 
@@ -315,6 +339,10 @@ class RetrainRequest(BaseModel):
         None,
         description="Path to new dataset for retraining (e.g., 'data/new_housing_data.csv'). If not provided, uses existing training data.",
     )
+    new_data_is_raw: bool = Field(
+        False,
+        description="Set when new_data_path holds unscaled features; they are scaled with models/scaler.pkl before training. Leave unset for data already preprocessed by src/load_data.py.",
+    )
 
     class Config:
         json_schema_extra = {
@@ -322,6 +350,7 @@ class RetrainRequest(BaseModel):
                 "model_type": "housing",
                 "force": True,
                 "new_data_path": "data/new_housing_data.csv",
+                "new_data_is_raw": True,
             }
         }
 
@@ -384,6 +413,73 @@ def root():
     return {"message": "Housing price prediction API is running."}
 
 
+FINAL_FEATURES = [
+    "MedInc",
+    "HouseAge",
+    "AveRooms",
+    "AveBedrms",
+    "Population",
+    "AveOccup",
+    "Latitude",
+    "Longitude",
+]
+
+
+def _prepare_features(rows: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Build the model feature frame for one or more validated request payloads."""
+    df = pd.DataFrame(rows)
+
+    # Feature engineering - same as training pipeline
+    df["AveRooms"] = df["total_rooms"] / df["households"]
+    df["AveBedrms"] = df["total_bedrooms"] / df["households"]
+    df["AveOccup"] = df["population"] / df["households"]
+
+    # Additional validation for derived features
+    too_many_rooms = df["AveRooms"] > 50
+    if too_many_rooms.any():
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "error": "ValidationError",
+                "message": "Derived feature validation failed",
+                "details": {
+                    "field": "average_rooms_per_household",
+                    "value": df.loc[too_many_rooms, "AveRooms"].iloc[0],
+                    "constraint": "Average rooms per household cannot exceed 50",
+                },
+            },
+        )
+
+    too_many_bedrooms = df["AveBedrms"] > 10
+    if too_many_bedrooms.any():
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "error": "ValidationError",
+                "message": "Derived feature validation failed",
+                "details": {
+                    "field": "average_bedrooms_per_household",
+                    "value": df.loc[too_many_bedrooms, "AveBedrms"].iloc[0],
+                    "constraint": "Average bedrooms per household cannot exceed 10",
+                },
+            },
+        )
+
+    # Rename columns to match model expectations
+    df.rename(
+        columns={
+            "median_income": "MedInc",
+            "housing_median_age": "HouseAge",
+            "latitude": "Latitude",
+            "longitude": "Longitude",
+            "population": "Population",
+        },
+        inplace=True,
+    )
+
+    return df[FINAL_FEATURES]
+
+
 @app.post(
     "/predict",
     response_model=HousingResponse,
@@ -404,67 +500,10 @@ def predict(data: HousingRequest):
         prediction_count += 1
 
         # Convert to DataFrame for processing
-        df = pd.DataFrame([data.model_dump()])
-
-        # Feature engineering - same as training pipeline
-        df["AveRooms"] = df["total_rooms"] / df["households"]
-        df["AveBedrms"] = df["total_bedrooms"] / df["households"]
-        df["AveOccup"] = df["population"] / df["households"]
-
-        # Additional validation for derived features
-        if df["AveRooms"].iloc[0] > 50:
-            raise HTTPException(
-                status_code=422,
-                detail={
-                    "error": "ValidationError",
-                    "message": "Derived feature validation failed",
-                    "details": {
-                        "field": "average_rooms_per_household",
-                        "value": df["AveRooms"].iloc[0],
-                        "constraint": "Average rooms per household cannot exceed 50",
-                    },
-                },
-            )
-
-        if df["AveBedrms"].iloc[0] > 10:
-            raise HTTPException(
-                status_code=422,
-                detail={
-                    "error": "ValidationError",
-                    "message": "Derived feature validation failed",
-                    "details": {
-                        "field": "average_bedrooms_per_household",
-                        "value": df["AveBedrms"].iloc[0],
-                        "constraint": "Average bedrooms per household cannot exceed 10",
-                    },
-                },
-            )
-
-        # Rename columns to match model expectations
-        df.rename(
-            columns={
-                "median_income": "MedInc",
-                "housing_median_age": "HouseAge",
-                "latitude": "Latitude",
-                "longitude": "Longitude",
-                "population": "Population",
-            },
-            inplace=True,
-        )
-
-        final_features = [
-            "MedInc",
-            "HouseAge",
-            "AveRooms",
-            "AveBedrms",
-            "Population",
-            "AveOccup",
-            "Latitude",
-            "Longitude",
-        ]
+        df = _prepare_features([data.model_dump()])
 
         # Make prediction
-        prediction = model.predict(df[final_features])[0]
+        prediction = model.predict(df)[0]
 
         # Validate prediction is reasonable (California housing prices)
         if prediction < 0 or prediction > 10:
@@ -473,11 +512,12 @@ def predict(data: HousingRequest):
         # Log to file and SQLite
         input_data = data.model_dump()
         logging.info(f"Input: {input_data} | Prediction: {prediction}")
-        cursor.execute(
-            "INSERT INTO housinglogs (timestamp, inputs, prediction) VALUES (?, ?, ?)",
-            (datetime.now().isoformat(), str(input_data), str(prediction)),
-        )
-        conn.commit()
+        with db_lock:
+            cursor.execute(
+                "INSERT INTO housinglogs (timestamp, inputs, prediction) VALUES (?, ?, ?)",
+                (datetime.now().isoformat(), str(input_data), str(prediction)),
+            )
+            conn.commit()
 
         # Record Prometheus metrics
         prediction_latency = time.time() - start_time
@@ -503,6 +543,10 @@ def predict(data: HousingRequest):
                 "details": str(e),
             },
         )
+    except HTTPException:
+        # Derived-feature validation failures from _prepare_features are 422s
+        MLOPS_VALIDATION_ERRORS.labels(service=SERVICE, endpoint="/predict").inc()
+        raise
     except Exception as e:
         logging.error(f"Prediction error: {e}")
         MLOPS_ERRORS.labels(service=SERVICE, endpoint="/predict").inc()
@@ -516,6 +560,87 @@ def predict(data: HousingRequest):
         )
 
 
+@app.post(
+    "/predict-batch",
+    response_model=HousingBatchResponse,
+    responses={422: {"model": ValidationErrorResponse}},
+)
+def predict_batch(data: HousingBatchRequest):
+    """
+    Predict housing prices for a batch of inputs with a single model call.
+
+    Each sample is validated exactly like a /predict request; the whole batch is
+    rejected if any sample fails validation.
+    """
+    global prediction_count
+
+    start_time = time.time()
+
+    try:
+        input_rows = [sample.model_dump() for sample in data.samples]
+        predictions = model.predict(_prepare_features(input_rows))
+        prediction_count += len(input_rows)
+
+        for prediction in predictions:
+            if prediction < 0 or prediction > 10:
+                logging.warning(f"Unusual prediction value: {prediction}")
+
+        # Log to file and SQLite
+        timestamp = datetime.now().isoformat()
+        logging.info(f"Batch of {len(input_rows)} inputs | Predictions: {predictions.tolist()}")
+        with db_lock:
+            cursor.executemany(
+                "INSERT INTO housinglogs (timestamp, inputs, prediction) VALUES (?, ?, ?)",
+                [
+                    (timestamp, str(row), str(prediction))
+                    for row, prediction in zip(input_rows, predictions)
+                ],
+            )
+            conn.commit()
+
+        # Record Prometheus metrics
+        prediction_latency = time.time() - start_time
+        MLOPS_API_REQUESTS.labels(
+            service=SERVICE, endpoint="/predict-batch", method="POST", status="200"
+        ).inc()
+        MLOPS_MODEL_PREDICTIONS.labels(service=SERVICE, model="DecisionTree").inc(
+            len(input_rows)
+        )
+        MLOPS_PREDICTION_LATENCY.labels(service=SERVICE, model="DecisionTree").observe(
+            prediction_latency
+        )
+        _update_gauges()
+
+        return HousingBatchResponse(predictions=[float(p) for p in predictions])
+
+    except ValidationError as e:
+        logging.error(f"Validation error: {e}")
+        MLOPS_VALIDATION_ERRORS.labels(service=SERVICE, endpoint="/predict-batch").inc()
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "error": "ValidationError",
+                "message": "Input validation failed",
+                "details": str(e),
+            },
+        )
+    except HTTPException:
+        # Derived-feature validation failures from _prepare_features are 422s
+        MLOPS_VALIDATION_ERRORS.labels(service=SERVICE, endpoint="/predict-batch").inc()
+        raise
+    except Exception as e:
+        logging.error(f"Batch prediction error: {e}")
+        MLOPS_ERRORS.labels(service=SERVICE, endpoint="/predict-batch").inc()
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "error": "PredictionError",
+                "message": "An error occurred during batch prediction",
+                "details": str(e),
+            },
+        )
+
+
 # Renamed to avoid conflict with Prometheus /metrics
 @app.get("/app-metrics")
 def metrics():
@@ -542,6 +667,7 @@ def run_model_retraining(
     model_type: Optional[str] = None,
     force: bool = False,
     new_data_path: Optional[str] = None,
+    new_data_is_raw: bool = False,
 ):
     """Background task to run model retraining."""
 
@@ -562,6 +688,7 @@ def run_model_retraining(
             "model_type": model_type,
             "force": force,
             "new_data_path": new_data_path,
+            "new_data_is_raw": new_data_is_raw,
             "results": {},
         }
 
@@ -585,7 +712,7 @@ def run_model_retraining(
 
                     # Retrain housing model
                     retrain_result = retrainer.retrain_housing_model(
-                        data_path=new_data_path
+                        data_path=new_data_path, raw=new_data_is_raw
                     )
                     results["results"]["housing"] = retrain_result
 
@@ -661,6 +788,7 @@ def retrain_model(request: RetrainRequest):
         model_type=request.model_type,
         force=request.force,
         new_data_path=request.new_data_path,
+        new_data_is_raw=request.new_data_is_raw,
     )
 
     # Retrieve last result and respond only after completion
@@ -3,108 +3,130 @@
 Generate sample prediction requests to populate metrics with data.
 """
 
-import requests
-import time
-import random
-import json
+import asyncio
+import httpx
+import numpy as np
+import orjson
 
-def generate_sample_requests():
-    """Generate sample prediction requests to populate metrics."""
-    base_url = "http://127.0.0.1:8000"
-    
-    # Sample data variations for California housing
-    sample_variations = [
-        {
-            "total_rooms": 4500.0,
-            "total_bedrooms": 900.0,
-            "population": 3000.0,
-            "households": 1000.0,
-            "median_income": 5.5,
-            "housing_median_age": 26.0,
-            "latitude": 37.86,
-            "longitude": -122.27,
-        },
-        {
-            "total_rooms": 3200.0,
-            "total_bedrooms": 650.0,
-            "population": 2100.0,
-            "households": 750.0,
-            "median_income": 4.2,
-            "housing_median_age": 35.0,
-            "latitude": 34.05,
-            "longitude": -118.24,
-        },
-        {
-            "total_rooms": 6800.0,
-            "total_bedrooms": 1200.0,
-            "population": 4500.0,
-            "households": 1500.0,
-            "median_income": 8.1,
-            "housing_median_age": 15.0,
-            "latitude": 37.77,
-            "longitude": -122.42,
-        },
-        {
-            "total_rooms": 2800.0,
-            "total_bedrooms": 580.0,
-            "population": 1800.0,
-            "households": 620.0,
-            "median_income": 3.8,
-            "housing_median_age": 42.0,
-            "latitude": 32.71,
-            "longitude": -117.16,
-        },
-        {
-            "total_rooms": 5200.0,
-            "total_bedrooms": 1050.0,
-            "population": 3500.0,
-            "households": 1200.0,
-            "median_income": 6.7,
-            "housing_median_age": 28.0,
-            "latitude": 37.39,
-            "longitude": -122.08,
-        }
+FIELDS = (
+    "total_rooms",
+    "total_bedrooms",
+    "population",
+    "households",
+    "median_income",
+    "housing_median_age",
+    "latitude",
+    "longitude",
+)
+
+# Base samples for California housing, one row per sample in FIELDS order
+BASES = np.array(
+    [
+        [4500.0, 900.0, 3000.0, 1000.0, 5.5, 26.0, 37.86, -122.27],
+        [3200.0, 650.0, 2100.0, 750.0, 4.2, 35.0, 34.05, -118.24],
+        [6800.0, 1200.0, 4500.0, 1500.0, 8.1, 15.0, 37.77, -122.42],
+        [2800.0, 580.0, 1800.0, 620.0, 3.8, 42.0, 32.71, -117.16],
+        [5200.0, 1050.0, 3500.0, 1200.0, 6.7, 28.0, 37.39, -122.08],
     ]
-    
-    print("🚀 Generating sample prediction requests...")
-    
-    successful_requests = 0
-    failed_requests = 0
-    
-    for i in range(20):  # Generate 20 sample requests
+)
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def create_client():
+    """Create a long-lived pooled HTTP client so requests reuse keep-alive connections."""
+    limits = httpx.Limits(
+        max_connections=20, max_keepalive_connections=20, keepalive_expiry=30
+    )
+    return httpx.AsyncClient(limits=limits, timeout=10)
+
+
+async def post_prediction(client, semaphore, base_url, i, sample):
+    """Send a single prediction request and report whether it succeeded."""
+    async with semaphore:
         try:
-            # Pick a random sample and add some variation
-            base_sample = random.choice(sample_variations)
-            sample = base_sample.copy()
-            
-            # Add small random variations
-            sample["total_rooms"] *= random.uniform(0.8, 1.2)
-            sample["total_bedrooms"] *= random.uniform(0.8, 1.2)
-            sample["population"] *= random.uniform(0.8, 1.2)
-            sample["households"] *= random.uniform(0.8, 1.2)
-            sample["median_income"] *= random.uniform(0.9, 1.1)
-            sample["housing_median_age"] *= random.uniform(0.9, 1.1)
-            sample["latitude"] += random.uniform(-0.1, 0.1)
-            sample["longitude"] += random.uniform(-0.1, 0.1)
-            
-            # Make prediction request
-            response = requests.post(f"{base_url}/predict", json=sample, timeout=10)
-            
+            response = await client.post(
+                f"{base_url}/predict",
+                content=orjson.dumps(sample),
+                headers=JSON_HEADERS,
+            )
             if response.status_code == 200:
-                result = response.json()
+                result = orjson.loads(response.content)
                 predicted_price = result.get('predicted_price', 'N/A')
                 print(f"✅ Request {i+1}: Predicted price = {predicted_price}")
-                successful_requests += 1
-            else:
-                print(f"❌ Request {i+1}: HTTP {response.status_code}")
-                failed_requests += 1
-                
-            # Small delay between requests
-            time.sleep(0.5)
-            
+                return True
+            print(f"❌ Request {i+1}: HTTP {response.status_code}")
+            return False
         except Exception as e:
             print(f"❌ Request {i+1}: {e}")
-            failed_requests += 1
+            return False
+
+
+async def post_prediction_batch(client, base_url, samples):
+    """Send all samples in one /predict-batch call.
+
+    Returns ``None`` when the API has no batch endpoint so callers can fall back
+    to individual requests.
+    """
+    try:
+        response = await client.post(
+            f"{base_url}/predict-batch",
+            content=orjson.dumps({"samples": samples}),
+            headers=JSON_HEADERS,
+            timeout=30,
+        )
+        if response.status_code == 404:
+            return None
+        if response.status_code != 200:
+            print(f"❌ Batch request: HTTP {response.status_code}")
+            return [False] * len(samples)
+        result = orjson.loads(response.content)
+    except Exception as e:
+        print(f"❌ Batch request: {e}")
+        return [False] * len(samples)
+
+    for i, predicted_price in enumerate(result["predictions"]):
+        print(f"✅ Request {i+1}: Predicted price = {predicted_price}")
+    return [True] * len(samples)
+
+
+async def generate_sample_requests(client, num_requests=20, max_concurrency=1):
+    """Generate sample prediction requests to populate metrics.
+
+    All samples are sent in a single /predict-batch request. Against an API
+    without that endpoint, individual requests are paced by a semaphore allowing
+    ``max_concurrency`` requests in flight at once. Those older APIs share one
+    SQLite cursor across requests without a lock, so the default sends them
+    one at a time.
+    """
+    base_url = "http://127.0.0.1:8000"
+    
+    print("🚀 Generating sample prediction requests...")
+    
+    # Pick random base samples and add small random variations in one pass
+    rng = np.random.default_rng()
+    idx = rng.integers(0, len(BASES), size=num_requests)
+    mult = np.ones((num_requests, len(FIELDS)))
+    mult[:, :4] = rng.uniform(0.8, 1.2, (num_requests, 4))
+    mult[:, 4:6] = rng.uniform(0.9, 1.1, (num_requests, 2))
+    adds = np.zeros((num_requests, len(FIELDS)))
+    adds[:, 6:8] = rng.uniform(-0.1, 0.1, (num_requests, 2))
+    rows = BASES[idx] * mult + adds
+    samples = [dict(zip(FIELDS, row)) for row in rows.tolist()]
+    
+    results = await post_prediction_batch(client, base_url, samples)
+    if results is None:
+        # Fall back to individual requests, capping in-flight requests on the API
+        semaphore = asyncio.Semaphore(max_concurrency)
+        results = await asyncio.gather(
+            *(
+                post_prediction(client, semaphore, base_url, i, sample)
+                for i, sample in enumerate(samples)
+            )
+        )
+    
+    successful_requests = sum(results)
+    failed_requests = len(results) - successful_requests
     
     print(f"\n📊 Summary:")
     print(f"- Successful requests: {successful_requests}")
@@ -113,70 +135,85 @@ def generate_sample_requests():
     
     return successful_requests, failed_requests
 
-def check_updated_metrics():
+async def check_updated_metrics(client):
     """Check the updated metrics after generating sample data."""
     print("\n🔍 Checking updated metrics...")
     
     try:
         # Check app metrics
-        response = requests.get("http://127.0.0.1:8000/app-metrics", timeout=5)
+        response = await client.get("http://127.0.0.1:8000/app-metrics", timeout=5)
         if response.status_code == 200:
-            metrics = response.json()
+            metrics = orjson.loads(response.content)
             print(f"✅ App metrics - Total predictions: {metrics.get('total_predictions', 'N/A')}")
         
         # Check Prometheus metrics for our custom metrics
-        response = requests.get("http://127.0.0.1:8000/metrics", timeout=5)
-        if response.status_code == 200:
-            metrics_text = response.text
-            
-            # Look for our custom metrics
-            custom_metrics = [
-                "mlops_api_requests_total",
-                "mlops_model_predictions_total", 
-                "mlops_model_prediction_latency_seconds",
-                "mlops_daily_predictions"
-            ]
-            
-            for metric in custom_metrics:
-                if metric in metrics_text:
-                    print(f"✅ Prometheus metric found: {metric}")
-                else:
-                    print(f"⚠️  Prometheus metric not found: {metric}")
+        custom_metrics = [
+            "mlops_api_requests_total",
+            "mlops_model_predictions_total", 
+            "mlops_model_prediction_latency_seconds",
+            "mlops_daily_predictions"
+        ]
+        
+        async with client.stream("GET", "http://127.0.0.1:8000/metrics", timeout=5) as response:
+            if response.status_code == 200:
+                # Stream the scrape line by line, stopping once every metric
+                # family we look for has shown up in a "# TYPE" line
+                remaining = set(custom_metrics)
+                async for line in response.aiter_lines():
+                    if line.startswith("# TYPE "):
+                        remaining.discard(line.split()[2])
+                        if not remaining:
+                            break
+                
+                for metric in custom_metrics:
+                    if metric not in remaining:
+                        print(f"✅ Prometheus metric found: {metric}")
+                    else:
+                        print(f"⚠️  Prometheus metric not found: {metric}")
         
     except Exception as e:
         print(f"❌ Error checking metrics: {e}")
 
+async def run():
+    """Check the API, generate sample traffic and report the resulting metrics."""
+    async with create_client() as client:
+        # Check if API is running. This also warms the pool: the connection
+        # stays open for the prediction requests to reuse.
+        try:
+            # Fail fast on a down server: 1s to connect, 2s to read
+            response = await client.get(
+                "http://127.0.0.1:8000/health", timeout=httpx.Timeout(2, connect=1)
+            )
+            if response.status_code != 200:
+                print("❌ API server is not responding properly")
+                return
+        except httpx.TransportError:
+            print("❌ API server is not running. Start it with:")
+            print("   uvicorn api.housing_api:app --host 127.0.0.1 --port 8000")
+            return
+        
+        print("✅ API server is running")
+        
+        # Generate sample requests
+        successful, failed = await generate_sample_requests(client)
+        
+        if successful > 0:
+            # Check updated metrics
+            await check_updated_metrics(client)
+            
+            print(f"\n🎯 Metrics populated with {successful} predictions!")
+            print("🌐 View metrics at:")
+            print("   - App metrics: http://127.0.0.1:8000/app-metrics")
+            print("   - Prometheus metrics: http://127.0.0.1:8000/metrics")
+            print("   - Prometheus UI: http://localhost:9090")
+            print("   - Grafana dashboard: http://localhost:3001")
+
 def main():
     """Main function."""
     print("📈 MLOps Housing Pipeline - Sample Data Generator")
     print("=" * 55)
     
-    # Check if API is running
-    try:
-        response = requests.get("http://127.0.0.1:8000/health", timeout=2)
-        if response.status_code != 200:
-            print("❌ API server is not responding properly")
-            return
-    except:
-        print("❌ API server is not running. Start it with:")
-        print("   uvicorn api.housing_api:app --host 127.0.0.1 --port 8000")
-        return
-    
-    print("✅ API server is running")
-    
-    # Generate sample requests
-    successful, failed = generate_sample_requests()
-    
-    if successful > 0:
-        # Check updated metrics
-        check_updated_metrics()
-        
-        print(f"\n🎯 Metrics populated with {successful} predictions!")
-        print("🌐 View metrics at:")
-        print("   - App metrics: http://127.0.0.1:8000/app-metrics")
-        print("   - Prometheus metrics: http://127.0.0.1:8000/metrics")
-        print("   - Prometheus UI: http://localhost:9090")
-        print("   - Grafana dashboard: http://localhost:3001")
+    asyncio.run(run())
 
 if __name__ == "__main__":
     main()
@@ -49,9 +49,26 @@ docker pull python:3.10-slim
 Write-Host "🚀 Starting services..."
 docker-compose -f docker-compose.monitoring.yml up -d
 
-# Wait for services to be ready
+# Wait for services to be ready (up to 30s, stop as soon as all respond)
 Write-Host "⏳ Waiting for services to initialize..."
-Start-Sleep -Seconds 30
+$healthUrls = @(
+    "http://localhost:8000/docs",
+    "http://localhost:9090/-/healthy",
+    "http://localhost:3001/api/health",
+    "http://localhost:5000"
+)
+$deadline = (Get-Date).AddSeconds(30)
+while ((Get-Date) -lt $deadline) {
+    try {
+        foreach ($url in $healthUrls) {
+            $remaining = [Math]::Max(1, [int][Math]::Ceiling(($deadline - (Get-Date)).TotalSeconds))
+            Invoke-WebRequest -Uri $url -UseBasicParsing -TimeoutSec $remaining | Out-Null
+        }
+        break
+    } catch {
+        Start-Sleep -Seconds 1
+    }
+}
 
 # Check service health
 Write-Host "🏥 Checking service health..."
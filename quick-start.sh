@@ -43,9 +43,23 @@ docker pull python:3.10-slim
 echo "🚀 Starting services..."
 docker-compose -f docker-compose.monitoring.yml up -d
 
-# Wait for services to be ready
+# Wait for services to be ready (up to 30s, stop as soon as all respond)
 echo "⏳ Waiting for services to initialize..."
-sleep 30
+deadline=$((SECONDS + 30))
+# Probe one URL, capping its timeout at whatever is left of the deadline
+probe() {
+    local left=$((deadline - SECONDS))
+    [ "$left" -gt 0 ] && curl -s --max-time "$left" "$1" > /dev/null
+}
+while [ "$SECONDS" -lt "$deadline" ]; do
+    if probe http://localhost:8000/docs \
+        && probe http://localhost:9090/-/healthy \
+        && probe http://localhost:3001/api/health \
+        && probe http://localhost:5000; then
+        break
+    fi
+    sleep 1
+done
 
 # Check service health
 echo "🏥 Checking service health..."
@@ -1,41 +1,64 @@
 from sklearn.datasets import fetch_california_housing
-import pandas as pd
 from sklearn.preprocessing import StandardScaler
+import argparse
 import os
+import joblib
 
-def load_and_save():
-    # Load the data
-    data = fetch_california_housing(as_frame=True)
+def load_and_save(export_csv=False):
+    # Get the project root directory (parent of src directory)
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    data_dir = os.path.join(project_root, "data")
+    output_path = os.path.join(data_dir, "housing.parquet")
+    csv_path = os.path.join(data_dir, "housing.csv")
+    scaler_path = os.path.join(project_root, "models", "scaler.pkl")
+
+    # Reuse previously preprocessed data unless a reload is forced
+    expected_outputs = [output_path, scaler_path]
+    if export_csv:
+        expected_outputs.append(csv_path)
+    if all(os.path.exists(p) for p in expected_outputs) and not os.environ.get(
+        "FORCE_RELOAD"
+    ):
+        print(f"Preprocessed data already cached at {output_path}")
+        return
+
+    # Load the data (raw download cached inside the project across runs)
+    data = fetch_california_housing(
+        data_home=os.path.join(project_root, ".sklearn_cache"), as_frame=True
+    )
     df = data.frame
 
     # --- Preprocessing ---
     # Check and drop missing values (usually none in this dataset)
     df.dropna(inplace=True)
 
-    # Separate features and target
-    X = df.drop("MedHouseVal", axis=1)
-    y = df["MedHouseVal"]
-
-    # Feature Scaling
+    # Feature Scaling - scale the feature columns in place, leaving the target as is
+    feature_cols = df.columns.drop("MedHouseVal")
     scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
+    df[feature_cols] = scaler.fit_transform(df[feature_cols])
 
-    # Reconstruct the processed dataframe
-    df_processed = pd.DataFrame(X_scaled, columns=X.columns)
-    df_processed["MedHouseVal"] = y.reset_index(drop=True)
+    # Persist the fitted scaler so new raw data can be transformed without refitting
+    os.makedirs(os.path.dirname(scaler_path), exist_ok=True)
+    joblib.dump(scaler, scaler_path, compress=3)
+    print(f"Fitted scaler saved to {scaler_path}")
 
-    # Get the project root directory (parent of src directory)
-    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    data_dir = os.path.join(project_root, "data")
-    
     # Create data directory if it doesn't exist
     os.makedirs(data_dir, exist_ok=True)
     
     # Save preprocessed data
-    output_path = os.path.join(data_dir, "housing.csv")
-    df_processed.to_csv(output_path, index=False)
+    df.to_parquet(output_path, engine="pyarrow", compression="snappy", index=False)
     print(f"Preprocessed data saved to {output_path}")
 
+    # Optional CSV copy for tools that cannot read Parquet
+    if export_csv:
+        df.to_csv(csv_path, index=False)
+        print(f"Preprocessed data exported to {csv_path}")
+
 
 if __name__ == "__main__":
-    load_and_save()
+    parser = argparse.ArgumentParser(description="Download and preprocess the housing dataset")
+    parser.add_argument(
+        "--csv", action="store_true", help="also export the preprocessed data as CSV"
+    )
+    args = parser.parse_args()
+    load_and_save(export_csv=args.csv)
@@ -175,19 +175,41 @@ class ModelRetrainer:
         self.models_dir = "models"
         os.makedirs(self.models_dir, exist_ok=True)
 
-    def retrain_housing_model(self, data_path: Optional[str] = None) -> Dict:
-        """Retrain the housing price prediction model."""
+    def retrain_housing_model(
+        self, data_path: Optional[str] = None, raw: bool = False
+    ) -> Dict:
+        """Retrain the housing price prediction model.
+
+        Custom data is assumed to be preprocessed like load_and_save's output;
+        pass raw=True to scale unscaled features with models/scaler.pkl first.
+        """
         logger.info(f"Starting housing model retraining with data_path: {data_path}")
 
         try:
             # Determine data path
             if data_path and os.path.exists(data_path):
                 logger.info(f"Using custom data path: {data_path}")
-                df = pd.read_csv(data_path)
+                if data_path.endswith(".parquet"):
+                    df = pd.read_parquet(data_path)
+                else:
+                    df = pd.read_csv(data_path)
                 logger.info(f"Loaded custom data with shape: {df.shape}")
+
+                # Raw data needs the scaler fitted by load_and_save; transforming
+                # the DataFrame lets sklearn check the feature names and order
+                scaler_path = f"{self.models_dir}/scaler.pkl"
+                if raw and os.path.exists(scaler_path):
+                    scaler = joblib.load(scaler_path)
+                    feature_cols = df.columns.drop("MedHouseVal")
+                    df[feature_cols] = scaler.transform(df[feature_cols])
+                    logger.info(f"Scaled raw custom data with {scaler_path}")
+                elif raw:
+                    logger.warning(
+                        f"Scaler {scaler_path} not found, using custom data as-is"
+                    )
             else:
                 # Use default data
-                default_path = "data/housing.csv"
+                default_path = "data/housing.parquet"
                 if not os.path.exists(default_path):
                     logger.error("Housing data not found. Running data loading...")
                     from load_data import load_and_save
@@ -195,10 +217,14 @@ class ModelRetrainer:
                     load_and_save()
 
                 logger.info(f"Using default data path: {default_path}")
-                df = pd.read_csv(default_path)
+                df = pd.read_parquet(default_path)
                 logger.info(f"Loaded default data with shape: {df.shape}")
-            X = df.drop("MedHouseVal", axis=1)
-            y = df["MedHouseVal"]
+
+            # Cast once to float32 so sklearn doesn't re-convert on every
+            # fit/predict call; X stays a DataFrame so the fitted models keep
+            # the feature names the API sends at predict time
+            y = df.pop("MedHouseVal").to_numpy(dtype=np.float32)
+            X = df.astype(np.float32)
 
             # Train-test split
             X_train, X_test, y_train, y_test = train_test_split(
@@ -235,8 +261,8 @@ class ModelRetrainer:
                         mlflow.log_metric("mse", mse)
                         mlflow.log_metric("r2_score", r2)
 
-                        signature = infer_signature(X_test, predictions)
                         input_example = X_test.head(2)
+                        signature = infer_signature(input_example, predictions)
                         mlflow.sklearn.log_model(
                             sk_model=mdl,
                             name="model",
@@ -245,7 +271,7 @@ class ModelRetrainer:
                         )
 
                         model_path = f"{self.models_dir}/{name}.pkl"
-                        joblib.dump(mdl, model_path)
+                        joblib.dump(mdl, model_path, compress=3)
 
                         return (
                             name,
@@ -268,7 +294,7 @@ class ModelRetrainer:
                     r2 = r2_score(y_test, predictions)
                     
                     model_path = f"{self.models_dir}/{name}.pkl"
-                    joblib.dump(mdl, model_path)
+                    joblib.dump(mdl, model_path, compress=3)
                     
                     return (
                         name,
@@ -297,7 +323,9 @@ class ModelRetrainer:
             # Update the main model with the best performing one
             if best_model:
                 main_model_path = f"{self.models_dir}/DecisionTree.pkl"
-                joblib.dump(best_model, main_model_path)
+                # Skip rewriting the file when the winner was already saved there
+                if results[best_name]["model_path"] != main_model_path:
+                    joblib.dump(best_model, main_model_path, compress=3)
                 logger.info(f"Updated main housing model with {best_name}")
 
                 # Try to register best model in MLflow
@@ -398,7 +426,7 @@ class ModelRetrainer:
                     )
 
                     model_path = f"{self.models_dir}/{name}.pkl"
-                    joblib.dump(mdl, model_path)
+                    joblib.dump(mdl, model_path, compress=3)
 
                     return (
                         name,
@@ -429,7 +457,9 @@ class ModelRetrainer:
             # Update the main model with the best performing one
             if best_model:
                 main_model_path = f"{self.models_dir}/RandomForest.pkl"
-                joblib.dump(best_model, main_model_path)
+                # Skip rewriting the file when the winner was already saved there
+                if results[best_name]["model_path"] != main_model_path:
+                    joblib.dump(best_model, main_model_path, compress=3)
                 logger.info(f"Updated main iris model with {best_name}")
 
                 # Try to register best model in MLflow
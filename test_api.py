@@ -5,13 +5,19 @@ Test script to verify the housing API and metrics endpoints are working.
 
 import sys
 import os
-import requests
+import asyncio
+import logging
+import httpx
 import time
-import json
+import orjson
 
 # Add current directory to path
 sys.path.append(".")
 
+# Importing the API configures INFO logging into its prediction log; keep
+# httpx's per-request INFO lines out of it
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
 
 def test_api_import():
     """Test if the API can be imported successfully."""
@@ -25,7 +31,17 @@ def test_api_import():
         return False
 
 
-def test_api_endpoints():
+async def _fetch_all(async_client, urls):
+    """GET all URLs concurrently, returning (status, raw body) or the raised exception per URL."""
+
+    async def fetch(url):
+        response = await async_client.get(url)
+        return response.status_code, response.content
+
+    return await asyncio.gather(*(fetch(url) for url in urls), return_exceptions=True)
+
+
+async def test_api_endpoints(async_client):
     """Test API endpoints if server is running."""
     base_url = "http://127.0.0.1:8000"
 
@@ -38,60 +54,117 @@ def test_api_endpoints():
 
     print("\n🔍 Testing API endpoints...")
 
-    for endpoint, method, description in endpoints_to_test:
-        try:
-            url = f"{base_url}{endpoint}"
-            response = requests.get(url, timeout=5)
+    results = await _fetch_all(
+        async_client, [f"{base_url}{endpoint}" for endpoint, *_ in endpoints_to_test]
+    )
 
-            if response.status_code == 200:
-                print(f"✅ {description} ({endpoint}): OK")
-                if endpoint == "/app-metrics":
-                    print(f"   Response: {response.json()}")
-                elif endpoint == "/metrics":
-                    lines = response.text.split("\n")[:5]  # Show first 5 lines
-                    print(f"   Prometheus metrics preview: {lines}")
-            else:
-                print(f"❌ {description} ({endpoint}): HTTP {response.status_code}")
-
-        except requests.exceptions.ConnectionError:
+    for (endpoint, method, description), result in zip(endpoints_to_test, results):
+        if isinstance(result, httpx.ConnectError):
             print(f"⚠️  {description} ({endpoint}): Server not running")
-        except Exception as e:
-            print(f"❌ {description} ({endpoint}): {e}")
+            continue
+        if isinstance(result, Exception):
+            print(f"❌ {description} ({endpoint}): {result}")
+            continue
+
+        status, body = result
+        if status == 200:
+            print(f"✅ {description} ({endpoint}): OK")
+            if endpoint == "/app-metrics":
+                print(f"   Response: {orjson.loads(body)}")
+            elif endpoint == "/metrics":
+                lines = body.decode().split("\n")[:5]  # Show first 5 lines
+                print(f"   Prometheus metrics preview: {lines}")
+        else:
+            print(f"❌ {description} ({endpoint}): HTTP {status}")
+
+
+SAMPLE_DATA = {
+    "total_rooms": 4500.0,
+    "total_bedrooms": 900.0,
+    "population": 3000.0,
+    "households": 1000.0,
+    "median_income": 5.5,
+    "housing_median_age": 26.0,
+    "latitude": 37.86,
+    "longitude": -122.27,
+}
 
 
-def test_prediction_endpoint():
+def test_prediction_endpoint(client):
     """Test the prediction endpoint with sample data."""
     base_url = "http://127.0.0.1:8000"
 
-    sample_data = {
-        "total_rooms": 4500.0,
-        "total_bedrooms": 900.0,
-        "population": 3000.0,
-        "households": 1000.0,
-        "median_income": 5.5,
-        "housing_median_age": 26.0,
-        "latitude": 37.86,
-        "longitude": -122.27,
-    }
-
     try:
         url = f"{base_url}/predict"
-        response = requests.post(url, json=sample_data, timeout=10)
+        response = client.post(
+            url,
+            content=orjson.dumps(SAMPLE_DATA),
+            headers={"Content-Type": "application/json"},
+            timeout=10,
+        )
 
         if response.status_code == 200:
-            result = response.json()
+            result = orjson.loads(response.content)
             print(f"✅ Prediction endpoint: OK")
             print(f"   Predicted price: {result.get('predicted_price', 'N/A')}")
         else:
             print(f"❌ Prediction endpoint: HTTP {response.status_code}")
             print(f"   Response: {response.text}")
 
-    except requests.exceptions.ConnectionError:
+    except httpx.ConnectError:
         print(f"⚠️  Prediction endpoint: Server not running")
     except Exception as e:
         print(f"❌ Prediction endpoint: {e}")
 
 
+def test_batch_prediction_endpoint(client):
+    """Test the batch prediction endpoint with a valid and an invalid batch."""
+    url = "http://127.0.0.1:8000/predict-batch"
+
+    # A batch is rejected as a whole if any single sample is invalid
+    invalid_sample = {**SAMPLE_DATA, "total_bedrooms": 5000.0}
+    # Passes field validation but averages ~13 bedrooms per household
+    invalid_derived_sample = {
+        **SAMPLE_DATA,
+        "total_rooms": 5000.0,
+        "total_bedrooms": 4000.0,
+        "population": 900.0,
+        "households": 300.0,
+    }
+    cases = [
+        ("valid batch", [SAMPLE_DATA, {**SAMPLE_DATA, "median_income": 3.0}], 200),
+        ("batch with invalid sample", [SAMPLE_DATA, invalid_sample], 422),
+        ("batch with invalid derived features", [SAMPLE_DATA, invalid_derived_sample], 422),
+    ]
+
+    for description, samples, expected_status in cases:
+        try:
+            response = client.post(
+                url,
+                content=orjson.dumps({"samples": samples}),
+                headers={"Content-Type": "application/json"},
+                timeout=10,
+            )
+
+            if response.status_code == expected_status:
+                print(f"✅ Batch prediction endpoint ({description}): HTTP {expected_status}")
+                if expected_status == 200:
+                    result = orjson.loads(response.content)
+                    print(f"   Predicted prices: {result.get('predictions', 'N/A')}")
+            else:
+                print(
+                    f"❌ Batch prediction endpoint ({description}): "
+                    f"HTTP {response.status_code}, expected {expected_status}"
+                )
+                print(f"   Response: {response.text}")
+
+        except httpx.ConnectError:
+            print(f"⚠️  Batch prediction endpoint: Server not running")
+            return
+        except Exception as e:
+            print(f"❌ Batch prediction endpoint ({description}): {e}")
+
+
 def start_api_server():
     """Try to start the API server."""
     try:
@@ -107,46 +180,37 @@ def start_api_server():
         return False
 
 
-def test_monitoring_services():
+async def test_monitoring_services(async_client):
     """Test Prometheus and Grafana services."""
     print("\n🔍 Testing monitoring services...")
 
-    # Test Prometheus
-    try:
-        response = requests.get("http://localhost:9090/-/healthy", timeout=5)
-        if response.status_code == 200:
-            print("✅ Prometheus: Healthy")
-        else:
-            print(f"❌ Prometheus: HTTP {response.status_code}")
-    except requests.exceptions.ConnectionError:
-        print(
-            "⚠️  Prometheus: Not running (start with: docker-compose up -d prometheus)"
-        )
-    except Exception as e:
-        print(f"❌ Prometheus: {e}")
+    services = [
+        ("Prometheus", "http://localhost:9090/-/healthy", "docker-compose up -d prometheus"),
+        ("Grafana", "http://localhost:3001/api/health", "docker-compose up -d grafana"),
+    ]
 
-    # Test Grafana
-    try:
-        response = requests.get("http://localhost:3001/api/health", timeout=5)
-        if response.status_code == 200:
-            print("✅ Grafana: Healthy")
+    results = await _fetch_all(async_client, [url for _, url, _ in services])
+
+    for (name, url, start_cmd), result in zip(services, results):
+        if isinstance(result, httpx.ConnectError):
+            print(f"⚠️  {name}: Not running (start with: {start_cmd})")
+        elif isinstance(result, Exception):
+            print(f"❌ {name}: {result}")
+        elif result[0] == 200:
+            print(f"✅ {name}: Healthy")
         else:
-            print(f"❌ Grafana: HTTP {response.status_code}")
-    except requests.exceptions.ConnectionError:
-        print("⚠️  Grafana: Not running (start with: docker-compose up -d grafana)")
-    except Exception as e:
-        print(f"❌ Grafana: {e}")
+            print(f"❌ {name}: HTTP {result[0]}")
 
 
-def test_prometheus_scraping():
+def test_prometheus_scraping(client):
     """Test if Prometheus is scraping our API metrics."""
     print("\n🔍 Testing Prometheus scraping...")
 
     try:
         # Check targets
-        response = requests.get("http://localhost:9090/api/v1/targets", timeout=5)
+        response = client.get("http://localhost:9090/api/v1/targets", timeout=5)
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             targets = data.get("data", {}).get("activeTargets", [])
 
             housing_api_target = None
@@ -173,6 +237,19 @@ def test_prometheus_scraping():
         print(f"❌ Prometheus scraping test failed: {e}")
 
 
+async def run_server_tests(client):
+    """Run the live-server checks, sharing one sync and one async client."""
+    async with httpx.AsyncClient(timeout=5) as async_client:
+        # Test endpoints
+        await test_api_endpoints(async_client)
+        test_prediction_endpoint(client)
+        test_batch_prediction_endpoint(client)
+
+        # Test monitoring services
+        await test_monitoring_services(async_client)
+        test_prometheus_scraping(client)
+
+
 def main():
     """Main test function."""
     print("🔧 MLOps Housing Pipeline - API & Metrics Test")
@@ -183,27 +260,28 @@ def main():
         print("\n❌ Cannot proceed with tests - API import failed")
         return
 
-    # Test 2: Check if server is already running
-    try:
-        response = requests.get("http://127.0.0.1:8000/health", timeout=2)
-        if response.status_code == 200:
-            print("✅ API server is already running")
-            server_running = True
-        else:
+    # One client for the whole run, so every sync check reuses its pooled
+    # connections instead of building a fresh client per call
+    with httpx.Client(timeout=10) as client:
+        # Test 2: Check if server is already running
+        try:
+            # Fail fast on a down server: 1s to connect, 2s to read
+            response = client.get(
+                "http://127.0.0.1:8000/health", timeout=httpx.Timeout(2, connect=1)
+            )
+            if response.status_code == 200:
+                print("✅ API server is already running")
+                server_running = True
+            else:
+                server_running = False
+        except httpx.TransportError:
             server_running = False
-    except:
-        server_running = False
-        print("⚠️  API server is not running")
-
-    if server_running:
-        # Test endpoints
-        test_api_endpoints()
-        test_prediction_endpoint()
+            print("⚠️  API server is not running")
 
-        # Test monitoring services
-        test_monitoring_services()
-        test_prometheus_scraping()
+        if server_running:
+            asyncio.run(run_server_tests(client))
 
+    if server_running:
         print("\n🎯 Summary:")
         print("- API Server: ✅ Running on http://127.0.0.1:8000")
         print("- App Metrics: ✅ Available at http://127.0.0.1:8000/app-metrics")